@@ -9,19 +9,34 @@ ders saati geldiğinde otomatik olarak bağlanır ve Zoom'a katılır.
 Kullanım:
     python auto_joiner.py           # Normal mod - zamanlayıcı ile çalışır
     python auto_joiner.py --test    # Test modu - hemen derse katılmayı dener
-    python auto_joiner.py --status  # Planlanmış dersleri gösterir
+    python auto_joiner.py --status  # Planlanmış dersleri / canlı oturumları gösterir
+    python auto_joiner.py --iptal MAT1072  # Canlı oturumu kapatır
 """
 
+import concurrent.futures
+import gzip
 import json
 import io
+import itertools
 import logging
 import os
+import re
+import secrets
 import sys
+import threading
 import time
 import argparse
+import heapq
+import hmac
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import deque
 from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
 
+from apscheduler.executors.pool import ThreadPoolExecutor
 from apscheduler.schedulers.blocking import BlockingScheduler
 from apscheduler.triggers.cron import CronTrigger
 from selenium import webdriver
@@ -32,7 +47,9 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import (
     TimeoutException,
+    InvalidSessionIdException,
     NoSuchElementException,
+    NoSuchWindowException,
     WebDriverException,
 )
 from webdriver_manager.chrome import ChromeDriverManager
@@ -43,17 +60,86 @@ SCRIPT_DIR = Path(__file__).parent
 SCHEDULE_FILE = SCRIPT_DIR / "schedule.json"
 LOG_FILE = SCRIPT_DIR / "bot.log"
 LMS_URL = "https://online.yildiz.edu.tr/?transaction=LMS.CORE.Cockpit.ViewCockpit/0"
+LMS_PROBE_URL = "https://online.yildiz.edu.tr/"
 
 # Bot icin ozel Chrome profil dizini (kullanici profili ile cakismaz)
 BOT_PROFILE_DIR = SCRIPT_DIR / "bot_chrome_profile"
 
 # Zamanlama
 DAKIKA_ONCE = 2  # Dersten kac dakika once katilmayi denesin
+MISFIRE_GRACE = 300  # saniye - gec kalan tetiklenme icin tolerans
+ZAMANLAYICI_ISCI = 10  # ayni anda calisabilecek katilim sayisi (thread havuzu)
+
+# Simulasyon (--simule) icin modellenen katilim suresi
+SIM_KATILIM_SN = 90  # Chrome acilisi + LMS gezinmesi + Zoom'a giris
+SIM_KILITLI_PROFIL_SN = 15  # profil kilitliyken create_driver'in basarisiz olma suresi
 
 # Yeniden deneme
 MAX_RETRY = 3
 RETRY_ARALIK = 15  # saniye
 
+# LMS saglik kontrolu ve devre kesici (ayni suredeki tum oturumlar ortak kullanir)
+LMS_PROBE_TIMEOUT = 5  # saniye - tarayici acmadan once yapilan hafif kontrol
+LMS_SAYFA_TIMEOUT = 30  # saniye - LMS sayfalari icin sayfa yukleme siniri
+ZOOM_SAYFA_TIMEOUT = 120  # saniye - Zoom web client icin sayfa yukleme siniri
+KESICI_ESIK = 3  # art arda bu kadar LMS hatasi devreyi acar
+KESICI_BEKLEME = 60  # saniye - acik devre tekrar denenmeden once bekler
+KESICI_MAX_BEKLEME = 15 * 60  # saniye - oturum LMS'i en fazla bu kadar bekler
+KESICI_KADEME = 20  # saniye - devre kapaninca bekleyen oturumlar arasi aralik
+
+# Hata kayitlari: debug/<hesap>_<ders>/ altinda boyutu sinirli halka tampon.
+# Ekran goruntusu sadece schedule.json'da "hata_kaydi": {"ekran_goruntusu": true} ise alinir.
+HATA_KAYIT_DIR = SCRIPT_DIR / "debug"
+HATA_KAYIT_MAX_BAYT = 5 * 1024 * 1024  # her hesap/ders dizini icin
+HATA_KAYIT_ARALIK = 10 * 60  # saniye - ayni hata bu sure icinde tekrar kaydedilmez
+HATA_KAYIT_MAX_DOM = 1_000_000  # karakter - DOM tarayicida bu uzunlukta kesilir
+ASAMA_GECMISI = 10  # kayda eklenen son asama suresi sayisi
+
+# Oturum yonetimi
+MAX_OTURUM_DAKIKA = 90  # 'bitis' yoksa tarayici en fazla bu kadar acik kalir
+OTURUM_KONTROL_ARALIK = 30  # saniye - toplanti bitti mi kontrol araligi
+
+# Chrome'un profil dizinine biraktigi kilit dosyalari
+PROFIL_KILITLERI = ("SingletonLock", "SingletonSocket", "SingletonCookie", "lockfile")
+
+# Zoom web client'ta toplantinin bittigini / botun cikarildigini gosteren durumlar
+TOPLANTI_BITTI_XPATH = (
+    "//*[contains(text(), 'meeting has been ended')] | "
+    "//*[contains(text(), 'ended by host')] | "
+    "//*[contains(text(), 'been removed from')] | "
+    "//*[contains(text(), 'sonlandırıldı')] | "
+    "//*[contains(text(), 'sonlandırdı')] | "
+    "//*[contains(text(), 'çıkarıldınız')]"
+)
+TOPLANTI_BITTI_URL = ("/wc/leave", "postattendee")
+
+# LMS gezinmesi sirasinda engellenen kaynaklar (CDP Network.setBlockedURLs desenleri).
+# schedule.json'daki "engellenen_kaynaklar" listesi bunu degistirir, [] kapatir.
+# Zoom sayfasina gecmeden once engel kaldirilir.
+# Not: Chrome bu desenleri sabitlemez; desen '*' ile bolunur ve parcalar URL icinde
+# sirayla aranir ("*.ico" -> jquery.icons.js de engellenir). Bu yuzden betik/stil
+# adlarinda sik gecen uzantilar (.ico, .svg) listede yok.
+_ENGELLENEN_UZANTILAR = (
+    # Gorseller, fontlar, medya
+    "png", "jpg", "jpeg", "gif", "webp",
+    "woff", "ttf", "otf", "eot",
+    "mp4", "webm", "mp3",
+)
+ENGELLENEN_KAYNAKLAR = [
+    *(f"*.{uzanti}" for uzanti in _ENGELLENEN_UZANTILAR),
+    # Analitik ve ucuncu parti widget'lar
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+    "*hotjar.com*", "*clarity.ms*", "*facebook.net*", "*mc.yandex.ru*",
+    "*fonts.googleapis.com*", "*fonts.gstatic.com*",
+]
+
+# Yerel kontrol API'si (--status/--test/--iptal calisan zamanlayiciya baglanir)
+KONTROL_HOST = "127.0.0.1"
+KONTROL_PORT = 8765
+KONTROL_TIMEOUT = 2  # saniye - istemci tarafi
+# Her baslangicta uretilen erisim anahtari; CLI bu dosyadan okuyup X-Bot-Token ile gonderir
+KONTROL_TOKEN_FILE = SCRIPT_DIR / ".kontrol_token"
+
 # Türkçe gün -> cron gün eşlemesi
 GUN_MAP = {
     "Pazartesi": "mon",
@@ -100,6 +186,14 @@ log = setup_logging()
 
 # ─── Program Yükleme ────────────────────────────────────────────────────────
 
+def _read_schedule(path: Path):
+    """Program dosyasini okur; (tum ayarlar, aktif dersler) dondurur."""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    aktif_dersler = [d for d in data.get("dersler", []) if d.get("aktif", False)]
+    return data, aktif_dersler
+
+
 def load_schedule() -> list:
     """schedule.json dosyasından aktif dersleri yükler."""
     if not SCHEDULE_FILE.exists():
@@ -107,11 +201,8 @@ def load_schedule() -> list:
         log.info("Lütfen schedule.json dosyasını oluşturun. Örnek için README.md'ye bakın.")
         sys.exit(1)
 
-    with open(SCHEDULE_FILE, "r", encoding="utf-8") as f:
-        data = json.load(f)
-
+    data, aktif_dersler = _read_schedule(SCHEDULE_FILE)
     dersler = data.get("dersler", [])
-    aktif_dersler = [d for d in dersler if d.get("aktif", False)]
 
     log.info(f"Toplam {len(dersler)} ders bulundu, {len(aktif_dersler)} tanesi aktif.")
 
@@ -121,21 +212,98 @@ def load_schedule() -> list:
     return aktif_dersler
 
 
+def load_settings() -> dict:
+    """schedule.json'daki genel ayarlari okur (dosya yoksa bos sozluk)."""
+    try:
+        with open(SCHEDULE_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
 # ─── Tarayıcı Yönetimi ──────────────────────────────────────────────────────
 
 
-def create_driver() -> webdriver.Chrome:
-    """Bot'a ozel Chrome profili ile tarayici baslatir."""
-    # Profil kilidini cozmek icin eski surecleri temizle
+def _is_bot_profile(cmdline: list) -> bool:
+    """Surec komut satiri bot profil dizinini kullaniyor mu?"""
+    profil = os.path.normcase(str(BOT_PROFILE_DIR.resolve()))
+    for arg in cmdline:
+        if arg.startswith("--user-data-dir="):
+            yol = arg.split("=", 1)[1].strip('"')
+            if os.path.normcase(str(Path(yol).resolve())) == profil:
+                return True
+    return False
+
+
+def _has_live_owner(proc) -> bool:
+    """
+    Surecin atalari arasinda hala calisan bir Python (bot) sureci var mi?
+    Bot Chrome'u chromedriver uzerinden bot surecinin alt sureci olarak
+    baslar; bot ya da chromedriver olunce bu zincir kopar.
+    """
+    return any("python" in ata.name().lower() for ata in proc.parents())
+
+
+def reap_orphan_browsers() -> int:
+    """
+    Bot profilini kullanan sahipsiz Chrome/chromedriver sureclerini kapatir
+    ve profilde calisan Chrome kalmadiysa kilit dosyalarini temizler.
+    Kullanicinin kendi Chrome pencerelerine ve hala calisan bir bot
+    surecine (zamanlayici, baska bir --test) ait tarayicilara dokunmaz.
+    """
     try:
-        import subprocess
-        log.info("Eski Chrome surecleri temizleniyor...")
-        subprocess.run(["taskkill", "/F", "/IM", "chrome.exe", "/T"], capture_output=True)
-        subprocess.run(["taskkill", "/F", "/IM", "chromedriver.exe", "/T"], capture_output=True)
-        time.sleep(2)
-    except Exception:
-        pass
+        import psutil
+    except ImportError:
+        log.warning("psutil yuklu degil, eski bot surecleri temizlenemedi.")
+        return 0
+
+    hedefler = {}
+    sahipli = 0
+    for proc in psutil.process_iter(["pid", "cmdline"]):
+        try:
+            if not _is_bot_profile(proc.info["cmdline"] or []):
+                continue
+            if _has_live_owner(proc):
+                sahipli += 1
+                continue
+            hedefler[proc.pid] = proc
+            parent = proc.parent()
+            if parent and "chromedriver" in parent.name().lower():
+                hedefler[parent.pid] = parent
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            continue
 
+    if hedefler:
+        log.info(f"Bot'a ait {len(hedefler)} eski Chrome sureci kapatiliyor...")
+        for proc in hedefler.values():
+            try:
+                proc.kill()
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                pass
+        _, hayatta = psutil.wait_procs(list(hedefler.values()), timeout=5)
+        if hayatta:
+            log.warning(f"{len(hayatta)} surec kapatilamadi, profil kilitleri korunuyor.")
+            return len(hedefler) - len(hayatta)
+
+    if sahipli:
+        log.info(f"Calisan bir bot surecine ait {sahipli} Chrome sureci korunuyor.")
+        return len(hedefler)
+
+    # Calisan bot Chrome'u kalmadi, artik kilitler sahipsiz
+    for ad in PROFIL_KILITLERI:
+        kilit = BOT_PROFILE_DIR / ad
+        if os.path.lexists(kilit):
+            try:
+                kilit.unlink()
+                log.info(f"Eski profil kilidi silindi: {ad}")
+            except OSError:
+                pass
+
+    return len(hedefler)
+
+
+def create_driver() -> webdriver.Chrome:
+    """Bot'a ozel Chrome profili ile tarayici baslatir."""
     log.info("Chrome tarayici baslatiliyor...")
 
     # Bot profil dizinini olustur
@@ -145,7 +313,7 @@ def create_driver() -> webdriver.Chrome:
     options.add_experimental_option("detach", True)
 
     # Bot'un kendi profil dizinini kullan (kullanici Chrome'u ile cakismaz)
-    options.add_argument(f"--user-data-dir={BOT_PROFILE_DIR}")
+    options.add_argument(f"--user-data-dir={BOT_PROFILE_DIR.resolve()}")
 
     # Zoom'un otomatik acilmasi icin gerekli izinler
     options.add_experimental_option("prefs", {
@@ -165,12 +333,63 @@ def create_driver() -> webdriver.Chrome:
         service = Service(ChromeDriverManager().install())
         driver = webdriver.Chrome(service=service, options=options)
         driver.set_window_size(1280, 800)
+        driver.set_page_load_timeout(LMS_SAYFA_TIMEOUT)
         log.info("[OK] Chrome basariyla baslatildi.")
-        return driver
     except WebDriverException as e:
         log.error(f"[HATA] Chrome baslatilamadi: {e}")
         raise
 
+    # LMS gezinmesi icin gereksiz kaynaklari engelle
+    desenler = load_settings().get("engellenen_kaynaklar", ENGELLENEN_KAYNAKLAR)
+    if not isinstance(desenler, list) or not all(isinstance(d, str) for d in desenler):
+        log.warning("'engellenen_kaynaklar' metin listesi olmali, varsayilan liste kullaniliyor.")
+        desenler = ENGELLENEN_KAYNAKLAR
+    _set_blocked_urls(driver, desenler)
+    return driver
+
+
+def _set_blocked_urls(driver, desenler: list):
+    """
+    Mevcut sekmede verilen URL desenlerine uyan istekleri CDP ile engeller.
+    Bos liste engeli kaldirir.
+    """
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": list(desenler)})
+        if desenler:
+            log.info(f"[OK] LMS gezinmesi icin {len(desenler)} kaynak deseni engellendi.")
+    except WebDriverException as e:
+        log.warning(f"Kaynak engelleme uygulanamadi: {e}")
+
+
+def _log_page_metrics(driver, etiket: str):
+    """
+    Son sayfanin yuklenme suresini ve aktarilan bayt miktarini loglar.
+
+    Bayt sayisi Resource Timing transferSize toplamidir. Timing-Allow-Origin
+    basligi olmayan ucuncu parti kaynaklar 0 bildirir; bunlar aktarilan_kb'ye
+    girmez, 'opak' alaninda ayrica sayilir.
+    """
+    try:
+        metrik = driver.execute_script("""
+            const nav = performance.getEntriesByType('navigation')[0];
+            const res = performance.getEntriesByType('resource');
+            return {
+                ms: nav ? Math.round(nav.duration) : null,
+                bayt: (nav ? nav.transferSize : 0)
+                      + res.reduce((t, r) => t + (r.transferSize || 0), 0),
+                istek: res.length + (nav ? 1 : 0),
+                opak: res.filter(r => !r.transferSize && !r.decodedBodySize).length,
+            };
+        """)
+        log.info(
+            f"[METRIK] sayfa={etiket} yukleme_ms={metrik['ms']} "
+            f"aktarilan_kb={metrik['bayt'] // 1024} istek={metrik['istek']} "
+            f"opak={metrik['opak']}"
+        )
+    except WebDriverException:
+        pass
+
 
 def _handle_login(driver):
     """
@@ -264,7 +483,7 @@ def _handle_login(driver):
 # ─── Zoom Tarayıcı Katılım ───────────────────────────────────────────────────
 
 
-def _join_zoom_from_browser(driver):
+def _join_zoom_from_browser(driver, oturum: dict):
     """
     Zoom web client sayfasinda derse katilir.
     Dogrudan /wc/join/ URL'sine gidildigi icin
@@ -394,13 +613,382 @@ def _join_zoom_from_browser(driver):
 
     except Exception as e:
         log.error(f"[HATA] Zoom katiliminda hata: {e}")
+        record_failure(driver, oturum, "zoom")
+
+
+# ─── Oturum Yönetimi ─────────────────────────────────────────────────────────
+
+# Bu surecteki canli oturumlar: oturum_id -> durum sozlugu
+_oturumlar = {}
+_oturum_kilit = threading.Lock()
+_oturum_sayac = itertools.count(1)
+
+
+class SessionCancelled(Exception):
+    """Oturum kontrol API'si uzerinden iptal edildi."""
+
+
+def _start_session(ders_adi: str, ders_kodu: str) -> dict:
+    """Yeni bir oturumu kayit defterine ekler."""
+    simdi = datetime.now()
+    oturum = {
+        "id": f"{ders_kodu or 'ders'}-{next(_oturum_sayac)}",
+        "ders": ders_adi,
+        "kod": ders_kodu,
+        "asama": "baslatiliyor",
+        "baslangic": simdi,
+        "asama_baslangic": simdi,
+        "asamalar": deque(maxlen=ASAMA_GECMISI),  # (asama, sure_sn)
+        "iptal": threading.Event(),
+    }
+    with _oturum_kilit:
+        _oturumlar[oturum["id"]] = oturum
+    return oturum
+
+
+def _set_stage(oturum: dict, asama: str, kontrol: bool = True):
+    """Oturumun asamasini gunceller; iptal istenmisse SessionCancelled firlatir."""
+    if kontrol and oturum["iptal"].is_set():
+        raise SessionCancelled(oturum["id"])
+    with _oturum_kilit:
+        simdi = datetime.now()
+        sure = (simdi - oturum["asama_baslangic"]).total_seconds()
+        oturum["asamalar"].append((oturum["asama"], round(sure, 1)))
+        oturum["asama"] = asama
+        oturum["asama_baslangic"] = simdi
+
+
+def _end_session(oturum: dict):
+    with _oturum_kilit:
+        _oturumlar.pop(oturum["id"], None)
+
+
+def cancel_sessions(anahtar: str) -> list:
+    """Oturum id'si veya ders koduna uyan canli oturumlari iptal eder."""
+    with _oturum_kilit:
+        hedefler = [o for o in _oturumlar.values() if anahtar in (o["id"], o["kod"])]
+    for oturum in hedefler:
+        oturum["iptal"].set()
+        log.info(f"Oturum iptal edildi: {oturum['id']} ({oturum['ders']})")
+    return [o["id"] for o in hedefler]
+
+
+def list_sessions() -> list:
+    """Canli oturumlarin asama ve gecen sure bilgisini dondurur."""
+    simdi = datetime.now()
+    with _oturum_kilit:
+        return [
+            {
+                "id": o["id"],
+                "ders": o["ders"],
+                "kod": o["kod"],
+                "asama": o["asama"],
+                "baslangic": o["baslangic"].isoformat(timespec="seconds"),
+                "gecen_saniye": int((simdi - o["baslangic"]).total_seconds()),
+                "asama_saniye": int((simdi - o["asama_baslangic"]).total_seconds()),
+            }
+            for o in _oturumlar.values()
+        ]
+
+
+def _session_deadline(bitis_saat: str = None) -> datetime:
+    """
+    Tarayicinin en gec kapanacagi zamani hesaplar.
+    'bitis' yoksa veya okunamiyorsa MAX_OTURUM_DAKIKA uygulanir.
+    """
+    simdi = datetime.now()
+    if bitis_saat:
         try:
-            ss = SCRIPT_DIR / f"debug_zoom_{datetime.now().strftime('%H%M%S')}.png"
-            driver.save_screenshot(str(ss))
-            log.info(f"Debug screenshot: {ss}")
-        except Exception:
+            bitis_obj = datetime.strptime(bitis_saat, "%H:%M")
+            # Eger bitis vakti gectiyse (gece dersi vb.), yarına atama yapma, hemen kapat
+            return simdi.replace(hour=bitis_obj.hour, minute=bitis_obj.minute, second=0, microsecond=0)
+        except ValueError:
+            log.error(f"Gecersiz bitis saati: '{bitis_saat}', varsayilan sure uygulanacak.")
+    return simdi + timedelta(minutes=MAX_OTURUM_DAKIKA)
+
+
+def _meeting_end_reason(driver):
+    """Toplanti bittiyse veya bot cikarildiysa sebebini, aksi halde None dondurur."""
+    url = driver.current_url
+    if any(parca in url for parca in TOPLANTI_BITTI_URL):
+        return f"toplantidan ayrilma sayfasi ({url})"
+
+    for el in driver.find_elements(By.XPATH, TOPLANTI_BITTI_XPATH):
+        if el.is_displayed():
+            return el.text.strip() or "toplanti sonlandirildi"
+    return None
+
+
+def _hold_session(driver, oturum: dict, bitis_saat: str = None):
+    """
+    Zoom oturumunu bitis saatine (yoksa MAX_OTURUM_DAKIKA) kadar acik tutar.
+    Toplanti sonlandirilirsa, bot cikarilirsa, tarayici kapanirsa
+    ya da oturum iptal edilirse hemen doner.
+    """
+    bitis_vakti = _session_deadline(bitis_saat)
+    kalan = (bitis_vakti - datetime.now()).total_seconds()
+    if kalan <= 0:
+        log.info(f"Ders bitis saati ({bitis_saat}) zaten gecmis veya su an.")
+        return
+
+    if bitis_saat:
+        log.info(f"Zoom tarayicida acik. Ders {bitis_saat}'de bitecek ({int(kalan/60)} dk kaldi).")
+    else:
+        log.info(f"Bitis saati belirtilmemis, tarayici en fazla {MAX_OTURUM_DAKIKA} dk acik kalacak.")
+
+    while True:
+        kalan = (bitis_vakti - datetime.now()).total_seconds()
+        if kalan <= 0:
+            log.info("Ders bitis saati geldi.")
+            return
+        if oturum["iptal"].wait(min(OTURUM_KONTROL_ARALIK, kalan)):
+            log.info("Oturum iptal edildi, tarayici kapatiliyor.")
+            return
+
+        try:
+            sebep = _meeting_end_reason(driver)
+        except (NoSuchWindowException, InvalidSessionIdException):
+            log.info("Tarayici disaridan kapatilmis, oturum sonlandiriliyor.")
+            return
+        except WebDriverException as e:
+            # Zoom yeniden cizerken eskiyen eleman, komut zaman asimi vb.
+            log.warning(f"Toplanti durumu okunamadi ({type(e).__name__}), kontrol devam ediyor.")
+            continue
+        except Exception as e:
+            # chromedriver olmus (urllib3 MaxRetryError, baglanti reddi vb.)
+            log.info(f"Tarayiciya ulasilamiyor ({type(e).__name__}), oturum sonlandiriliyor.")
+            return
+        if sebep:
+            log.info(f"Toplanti sona erdi: {sebep}")
+            return
+
+
+# ─── Hata Kayıtları ──────────────────────────────────────────────────────────
+
+# Sikistirma ve diske yazma tek bir arka plan thread'inde yapilir
+_kayit_havuzu = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="hata-kaydi")
+_son_kayitlar = {}  # (kod, etiket, url) -> son kayit zamani
+_kayit_kilit = threading.Lock()
+
+
+def _safe_name(ad: str) -> str:
+    return re.sub(r"[^\w.-]", "_", ad)[:80] or "ders"
+
+
+def _trim_artifacts(dizin: Path):
+    """Dizin HATA_KAYIT_MAX_BAYT'i asarsa en eski kayitlari siler (en yenisi kalir)."""
+    dosyalar = sorted(dizin.iterdir(), key=lambda p: p.name)
+    toplam = sum(p.stat().st_size for p in dosyalar)
+    for eski in dosyalar[:-1]:
+        if toplam <= HATA_KAYIT_MAX_BAYT:
+            break
+        toplam -= eski.stat().st_size
+        eski.unlink()
+
+
+def _write_artifact(dizin: Path, ad: str, kayit: dict, png):
+    try:
+        dizin.mkdir(parents=True, exist_ok=True)
+        with gzip.open(dizin / f"{ad}.json.gz", "wt", encoding="utf-8") as f:
+            json.dump(kayit, f, ensure_ascii=False)
+        if png:
+            (dizin / f"{ad}.png").write_bytes(png)
+        _trim_artifacts(dizin)
+        log.info(f"Hata kaydi yazildi: {dizin / ad}")
+    except OSError as e:
+        log.warning(f"Hata kaydi yazilamadi: {e}")
+
+
+def record_failure(driver, oturum: dict, etiket: str):
+    """
+    Hata anindaki URL'yi, DOM'u ve son asama surelerini kaydeder.
+
+    DOM (HATA_KAYIT_MAX_DOM karakterde kesilmis) ve istenirse ekran goruntusu
+    oturum thread'inde, tarayicidan senkron alinir; yalnizca sikistirma ve yazma
+    arka planda yapilir. Ayni ders/etiket/URL icin HATA_KAYIT_ARALIK icinde tek
+    kayit alinir.
+    """
+    try:
+        url = driver.current_url
+    except WebDriverException:
+        url = ""
+
+    anahtar = (oturum["kod"], etiket, url.split("?")[0])
+    simdi = time.monotonic()
+    with _kayit_kilit:
+        # Suresi dolmus kayitlari at (sozluk surec boyunca buyumesin)
+        for eski in [k for k, t in _son_kayitlar.items() if simdi - t >= HATA_KAYIT_ARALIK]:
+            del _son_kayitlar[eski]
+        if anahtar in _son_kayitlar:
+            log.info(f"Ayni hata ({etiket}) yakin zamanda kaydedildi, tekrar kaydedilmedi.")
+            return
+        _son_kayitlar[anahtar] = simdi
+
+    try:
+        # Kesme tarayicida yapilir; buyuk sayfalar WebDriver uzerinden tasinmaz
+        dom = driver.execute_script(
+            "return document.documentElement ? document.documentElement.outerHTML.slice(0, arguments[0]) : '';",
+            HATA_KAYIT_MAX_DOM,
+        ) or ""
+    except WebDriverException:
+        dom = ""
+
+    ayarlar = load_settings()
+    hata_kaydi = ayarlar.get("hata_kaydi", {})
+    if not isinstance(hata_kaydi, dict):
+        log.warning("'hata_kaydi' sozluk olmali, varsayilan ayarlar kullaniliyor.")
+        hata_kaydi = {}
+    ekran_goruntusu = hata_kaydi.get("ekran_goruntusu", False)
+    if not isinstance(ekran_goruntusu, bool):
+        log.warning("'hata_kaydi.ekran_goruntusu' true/false olmali, ekran goruntusu alinmiyor.")
+        ekran_goruntusu = False
+
+    png = None
+    if ekran_goruntusu:
+        try:
+            png = driver.get_screenshot_as_png()
+        except WebDriverException:
             pass
 
+    with _oturum_kilit:
+        asamalar = list(oturum["asamalar"])
+        asama_suresi = (datetime.now() - oturum["asama_baslangic"]).total_seconds()
+    asamalar.append((oturum["asama"], round(asama_suresi, 1)))
+
+    zaman = datetime.now()
+    kayit = {
+        "zaman": zaman.isoformat(timespec="seconds"),
+        "etiket": etiket,
+        "ders": oturum["ders"],
+        "kod": oturum["kod"],
+        "url": url,
+        "asamalar": asamalar[-ASAMA_GECMISI:],
+        "dom": dom,
+    }
+    login = ayarlar.get("login", {})
+    email = login.get("email", "") if isinstance(login, dict) else None
+    if not isinstance(email, str):
+        log.warning("'login.email' metin olmali, hata kaydi 'bot' dizinine yaziliyor.")
+        email = ""
+    hesap = email.split("@")[0] or "bot"
+    dizin = HATA_KAYIT_DIR / _safe_name(f"{hesap}_{oturum['kod'] or oturum['ders']}")
+    _kayit_havuzu.submit(_write_artifact, dizin, f"{zaman:%Y%m%d_%H%M%S_%f}_{etiket}", kayit, png)
+
+
+# ─── LMS Sağlık Kontrolü ─────────────────────────────────────────────────────
+
+# Devre kesici durumu: "kapali" (normal), "acik" (LMS cokmus), "yari_acik" (tek prob).
+# "sira": bu acilma doneminde devre kapandiktan sonra birakilan oturum sayisi.
+_kesici = {"durum": "kapali", "hata": 0, "acilma": 0.0, "sira": 0}
+_kesici_kilit = threading.Lock()
+
+
+def _circuit_transition(yeni: str, sebep: str):
+    """Devre durumunu degistirir ve metrik olarak loglar. Kilit altinda cagrilir."""
+    eski = _kesici["durum"]
+    if eski == yeni:
+        return
+    _kesici["durum"] = yeni
+    if yeni == "acik":
+        _kesici["acilma"] = time.monotonic()
+        if eski == "kapali":
+            # Yeni acilma donemi: kademeli birakma sirasi bastan baslar
+            _kesici["sira"] = 0
+    log.info(
+        f"[METRIK] lms_kesici durum={yeni} onceki={eski} "
+        f"hata={_kesici['hata']} sebep={sebep}"
+    )
+
+
+def record_lms_success():
+    with _kesici_kilit:
+        _kesici["hata"] = 0
+        _circuit_transition("kapali", "lms_yanit_verdi")
+
+
+def record_lms_failure(sebep: str):
+    with _kesici_kilit:
+        _kesici["hata"] += 1
+        if _kesici["durum"] == "yari_acik" or _kesici["hata"] >= KESICI_ESIK:
+            _circuit_transition("acik", sebep)
+
+
+def lms_circuit_open() -> bool:
+    with _kesici_kilit:
+        return _kesici["durum"] != "kapali"
+
+
+def probe_lms() -> bool:
+    """
+    LMS'e tarayici acmadan kisa bir istek atar; sunucu yanit veriyorsa True.
+    Her hata (BadStatusLine gibi http.client hatalari dahil) False sayilir ki
+    yari_acik devre her zaman bir sonuc alsin.
+    """
+    try:
+        with urllib.request.urlopen(LMS_PROBE_URL, timeout=LMS_PROBE_TIMEOUT):
+            return True
+    except urllib.error.HTTPError as e:
+        # 4xx sunucunun ayakta oldugunu gosterir
+        return e.code < 500
+    except Exception:
+        return False
+
+
+def wait_for_lms(oturum: dict) -> bool:
+    """
+    Tarayici acmadan once LMS'in erisilebilir oldugunu dogrular.
+
+    Devre aciksa oturum tarayicisiz bekler; KESICI_BEKLEME sonunda tek bir
+    oturum prob atar (yari_acik), digerleri sonucu bekler. Devre kapaninca
+    acik/yari_acik devrede bekleyen oturumlar KESICI_KADEME aralikla sirayla
+    birakilir; devre acilmadan gecen tekil hatalar kademeye girmez.
+    KESICI_MAX_BEKLEME icinde LMS acilmazsa False dondurur.
+    """
+    son_an = time.monotonic() + KESICI_MAX_BEKLEME
+    bekledi = False
+    devre_bekledi = False
+
+    while True:
+        prob_at = False
+        with _kesici_kilit:
+            durum = _kesici["durum"]
+            devre_bekledi = devre_bekledi or durum != "kapali"
+            bekleme = KESICI_BEKLEME - (time.monotonic() - _kesici["acilma"])
+            if durum == "kapali":
+                prob_at = True
+            elif durum == "acik" and bekleme <= 0:
+                _circuit_transition("yari_acik", "bekleme_doldu")
+                prob_at = True
+
+        if prob_at:
+            if probe_lms():
+                record_lms_success()
+                break
+            record_lms_failure("prob_basarisiz")
+            bekleme = KESICI_BEKLEME
+        elif durum == "yari_acik":
+            # Baska bir oturum prob atiyor
+            bekleme = LMS_PROBE_TIMEOUT
+
+        kalan = son_an - time.monotonic()
+        if kalan <= 0:
+            return False
+        if not bekledi:
+            log.warning("LMS erisilemiyor, tarayici acilmadan bekleniyor...")
+            bekledi = True
+        if oturum["iptal"].wait(min(max(bekleme, 1), kalan)):
+            raise SessionCancelled(oturum["id"])
+
+    if devre_bekledi:
+        with _kesici_kilit:
+            sira = _kesici["sira"]
+            _kesici["sira"] += 1
+        if sira:
+            log.info(f"LMS tekrar erisilebilir, {sira * KESICI_KADEME} sn kademeli bekleme.")
+            if oturum["iptal"].wait(sira * KESICI_KADEME):
+                raise SessionCancelled(oturum["id"])
+    return True
+
 
 # ─── Derse Katılma ───────────────────────────────────────────────────────────
 
@@ -416,20 +1004,39 @@ def join_class(ders_adi: str, ders_kodu: str = "", bitis_saat: str = None):
     """
     log.info(f"--- Derse katilim baslatiliyor: {ders_adi} ({ders_kodu}) ---")
 
+    oturum = _start_session(ders_adi, ders_kodu)
     driver = None
+    buton_bulundu = False
     try:
+        # ── ADIM 0: LMS ayakta mi? (tarayici acmadan) ──────────────────
+        _set_stage(oturum, "lms_bekleniyor")
+        if not wait_for_lms(oturum):
+            log.error(f"[HATA] LMS {KESICI_MAX_BEKLEME // 60} dk boyunca erisilemedi, katilim iptal.")
+            return
+
+        _set_stage(oturum, "tarayici")
         driver = create_driver()
 
         # ── ADIM 1: LMS ana sayfasina git ────────────────────────────────
+        _set_stage(oturum, "lms")
         log.info(f"LMS'ye gidiliyor: {LMS_URL}")
-        driver.get(LMS_URL)
+        try:
+            driver.get(LMS_URL)
+        except TimeoutException:
+            record_lms_failure("sayfa_zaman_asimi")
+            log.error(f"[HATA] LMS {LMS_SAYFA_TIMEOUT} sn icinde yuklenmedi, islem iptal ediliyor.")
+            return
+        record_lms_success()
         time.sleep(4)
+        _log_page_metrics(driver, "lms")
 
         # ── ADIM 1.5: Login gerekiyorsa otomatik giris yap ───────────
+        _set_stage(oturum, "login")
         if not _handle_login(driver):
             log.error("[HATA] Login yapilamadi, islem iptal ediliyor.")
             return
         # ── ADIM 2: "Etkinlik Akisi" sekmesine tikla ────────────────────
+        _set_stage(oturum, "etkinlik_akisi")
         log.info("'Etkinlik Akisi' sekmesi araniyor...")
         try:
             etkinlik_tab = WebDriverWait(driver, 15).until(
@@ -448,6 +1055,7 @@ def join_class(ders_adi: str, ders_kodu: str = "", bitis_saat: str = None):
             log.warning("'Etkinlik Akisi' sekmesi bulunamadi, sayfa zaten acik olabilir.")
 
         # ── ADIM 3: Ders kartini bul ve tikla ────────────────────────────
+        _set_stage(oturum, "ders_karti")
         log.info(f"Ders karti araniyor: {ders_kodu} / {ders_adi}...")
 
         ders_karti_bulundu = False
@@ -471,6 +1079,7 @@ def join_class(ders_adi: str, ders_kodu: str = "", bitis_saat: str = None):
             ders_karti_bulundu = True
             log.info("[OK] Ders detay sayfasi aciliyor...")
             time.sleep(4)
+            _log_page_metrics(driver, "ders")
 
         except TimeoutException:
             log.warning(f"Ders karti ({ders_kodu}) tiklanamadi, dogrudan ders adi ile deneniyor...")
@@ -494,6 +1103,7 @@ def join_class(ders_adi: str, ders_kodu: str = "", bitis_saat: str = None):
 
         # ── ADIM 4: "Canli Ders" sekmesinin acik oldugundan emin ol ──────
         if ders_karti_bulundu:
+            _set_stage(oturum, "canli_ders")
             try:
                 canli_ders_tab = WebDriverWait(driver, 10).until(
                     EC.element_to_be_clickable((By.XPATH,
@@ -509,8 +1119,8 @@ def join_class(ders_adi: str, ders_kodu: str = "", bitis_saat: str = None):
                 log.info("'Canli Ders' sekmesi zaten acik olabilir, devam ediliyor...")
 
         # ── ADIM 5: "Derse Katil" butonunu bul ve tikla ─────────────────
+        _set_stage(oturum, "derse_katil")
         log.info("'Derse Katil' butonu araniyor...")
-        buton_bulundu = False
 
         for attempt in range(MAX_RETRY):
             try:
@@ -530,6 +1140,9 @@ def join_class(ders_adi: str, ders_kodu: str = "", bitis_saat: str = None):
                 )
 
                 log.info("[OK] 'Derse Katil' butonu bulundu! Tiklaniyor...")
+                # Zoom sayfasi tum kaynaklarina ihtiyac duyar, engeli kaldir
+                _set_blocked_urls(driver, [])
+                driver.set_page_load_timeout(ZOOM_SAYFA_TIMEOUT)
                 eski_pencere_sayisi = len(driver.window_handles)
                 katil_button.click()
                 buton_bulundu = True
@@ -559,12 +1172,13 @@ def join_class(ders_adi: str, ders_kodu: str = "", bitis_saat: str = None):
                     log.info(f"[OK] Web client URL: {wc_url}")
 
                     # Dogrudan web client'a git (popup YOK!)
+                    _set_stage(oturum, "zoom")
                     driver.get(wc_url)
                     log.info("[OK] Zoom web client'a yonlendirildi!")
                     time.sleep(5)
 
                     # Web client katilim islemleri
-                    _join_zoom_from_browser(driver)
+                    _join_zoom_from_browser(driver, oturum)
                 else:
                     log.info(f"Zoom URL bulunamadi, mevcut URL: {driver.current_url}")
 
@@ -572,12 +1186,16 @@ def join_class(ders_adi: str, ders_kodu: str = "", bitis_saat: str = None):
 
             except TimeoutException:
                 remaining = MAX_RETRY - attempt - 1
+                if remaining > 0 and lms_circuit_open():
+                    log.error("[HATA] LMS erisilemiyor (devre acik), yeniden deneme yapilmadi.")
+                    break
                 if remaining > 0:
                     log.warning(
                         f"Buton bulunamadi, {RETRY_ARALIK}s sonra tekrar denenecek "
                         f"({remaining} deneme kaldi)..."
                     )
-                    time.sleep(RETRY_ARALIK)
+                    if oturum["iptal"].wait(RETRY_ARALIK):
+                        raise SessionCancelled(oturum["id"])
                     driver.refresh()
                     time.sleep(3)
                 else:
@@ -587,61 +1205,68 @@ def join_class(ders_adi: str, ders_kodu: str = "", bitis_saat: str = None):
                     )
 
         if not buton_bulundu:
-            # Sayfanin ekran goruntusunu kaydet (debug icin)
-            try:
-                screenshot_path = SCRIPT_DIR / f"debug_{ders_kodu}_{datetime.now().strftime('%H%M%S')}.png"
-                driver.save_screenshot(str(screenshot_path))
-                log.info(f"Debug ekran goruntusu kaydedildi: {screenshot_path}")
-            except Exception:
-                pass
+            # Sayfanin durumunu kaydet (debug icin)
+            record_failure(driver, oturum, "buton_yok")
 
+    except SessionCancelled:
+        log.info(f"Katilim iptal edildi: {ders_adi} ({ders_kodu})")
     except WebDriverException as e:
         log.error(f"[HATA] Tarayici hatasi: {e}")
     except Exception as e:
         log.error(f"[HATA] Beklenmeyen hata: {e}")
     finally:
-        if driver:
-            if buton_bulundu:
-                # Zoom tarayicida acik, bitis saatine kadar bekle
-                if bitis_saat:
-                    try:
-                        simdi = datetime.now()
-                        bitis_obj = datetime.strptime(bitis_saat, "%H:%M")
-                        bitis_vakti = simdi.replace(hour=bitis_obj.hour, minute=bitis_obj.minute, second=0, microsecond=0)
-                        
-                        # Eger bitis vakti gectiyse (gece dersi vb.), yarına atama yapma, sadece bekleme
-                        bekleme_suresi = (bitis_vakti - simdi).total_seconds()
-                        
-                        if bekleme_suresi > 0:
-                            log.info(f"Zoom tarayicida acik. Ders {bitis_saat}'de bitecek ({int(bekleme_suresi/60)} dk kaldi).")
-                            time.sleep(bekleme_suresi)
-                            log.info("Ders bitis saati geldi.")
-                        else:
-                            log.info(f"Ders bitis saati ({bitis_saat}) zaten gecmis veya su an.")
-                    except Exception as e:
-                        log.error(f"Bitis saati hesaplama hatasi: {e}")
-                        log.info("Otomatik kapanma devre disi, tarayici acik kalacak.")
-                        # Eski davranis: hic kapatma
-                        pass
+        try:
+            if driver:
+                if buton_bulundu and not oturum["iptal"].is_set():
+                    # Zoom tarayicida acik, bitis saatine / toplanti sonuna kadar bekle
+                    _set_stage(oturum, "derste", kontrol=False)
+                    _hold_session(driver, oturum, bitis_saat)
                 else:
-                    log.info("Bitis saati belirtilmemis, tarayici acik kalacak.")
-                    return # Kapatmadan cik (detach modu devrede)
-            else:
-                # Buton bulunamadiysa biraz bekle ve kapat
-                time.sleep(10)
-
-            try:
-                driver.quit()
-                log.info("Tarayici kapatildi.")
-            except Exception:
-                pass
+                    # Buton bulunamadiysa biraz bekle ve kapat (iptalde beklemez)
+                    oturum["iptal"].wait(10)
+        except Exception as e:
+            log.error(f"[HATA] Oturum beklenirken hata: {e}")
+        finally:
+            # Ne olursa olsun tarayiciyi kapat ve oturumu kayittan dus
+            if driver:
+                _set_stage(oturum, "kapaniyor", kontrol=False)
+                try:
+                    driver.quit()
+                    log.info("Tarayici kapatildi.")
+                except Exception:
+                    pass
+            _end_session(oturum)
 
 
 # ─── Zamanlayıcı ─────────────────────────────────────────────────────────────
 
+def _parse_ders(ders: dict):
+    """
+    Ders kaydini (cron gunu, tetiklenme saati) ikilisine cevirir.
+    Gecersiz gun/saat icin ValueError firlatir.
+    """
+    gun = ders.get("gun")
+    cron_gun = GUN_MAP.get(gun)
+    if not cron_gun:
+        raise ValueError(f"Gecersiz gun: '{gun}'")
+
+    saat_str = ders.get("saat")
+    try:
+        saat_obj = datetime.strptime(saat_str, "%H:%M")
+    except (TypeError, ValueError):
+        raise ValueError(f"Gecersiz saat formati: '{saat_str}'")
+
+    # Dersten DAKIKA_ONCE dakika once calistir
+    return cron_gun, saat_obj - timedelta(minutes=DAKIKA_ONCE)
+
+
+def _job_id(ders: dict) -> str:
+    return f"ders_{ders.get('kod') or ders.get('ad', '').replace(' ', '_')}"
+
+
 def setup_scheduler(dersler: list) -> BlockingScheduler:
     """APScheduler ile ders programini zamanlar."""
-    scheduler = BlockingScheduler()
+    scheduler = BlockingScheduler(executors={"default": ThreadPoolExecutor(ZAMANLAYICI_ISCI)})
 
     for ders in dersler:
         gun = ders["gun"]
@@ -651,21 +1276,12 @@ def setup_scheduler(dersler: list) -> BlockingScheduler:
 
         bitis = ders.get("bitis")
 
-        cron_gun = GUN_MAP.get(gun)
-        if not cron_gun:
-            log.error(f"Gecersiz gun: '{gun}' -- {ad} dersi atlandi.")
-            continue
-
-        # Saati parse et
         try:
-            saat_obj = datetime.strptime(saat_str, "%H:%M")
-        except ValueError:
-            log.error(f"Gecersiz saat formati: '{saat_str}' -- {ad} dersi atlandi.")
+            cron_gun, erken = _parse_ders(ders)
+        except ValueError as e:
+            log.error(f"{e} -- {ad} dersi atlandi.")
             continue
 
-        # Dersten DAKIKA_ONCE dakika once calistir
-        erken = saat_obj - timedelta(minutes=DAKIKA_ONCE)
-
         trigger = CronTrigger(
             day_of_week=cron_gun,
             hour=erken.hour,
@@ -676,9 +1292,9 @@ def setup_scheduler(dersler: list) -> BlockingScheduler:
             join_class,
             trigger=trigger,
             args=[ad, kod, bitis],
-            id=f"ders_{kod or ad.replace(' ', '_')}",
+            id=_job_id(ders),
             name=f"{kod} {ad} ({gun} {saat_str})",
-            misfire_grace_time=300,  # 5 dakika tolerans
+            misfire_grace_time=MISFIRE_GRACE,
         )
 
         erken_str = erken.strftime("%H:%M")
@@ -711,6 +1327,351 @@ def show_status(dersler: list):
     print("+===========================================================+\n")
 
 
+# ─── Simülasyon ──────────────────────────────────────────────────────────────
+
+HAFTA_SN = 7 * 86400
+CRON_GUNLER = ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]
+_GUN_ADLARI = {cron: gun for gun, cron in GUN_MAP.items()}
+_ASCII_TR = str.maketrans("ıİçÇşŞğĞöÖüÜ", "iIcCsSgGoOuU")
+
+
+def _suggest_gun(gun):
+    """'Sali' gibi ASCII yazilmis gun adinin GUN_MAP'teki karsiligini bulur."""
+    if not isinstance(gun, str):
+        return None
+    hedef = gun.strip().translate(_ASCII_TR).lower()
+    return next((g for g in GUN_MAP if g.translate(_ASCII_TR).lower() == hedef), None)
+
+
+def _fmt_hafta(t: float) -> str:
+    """Hafta basindan itibaren saniyeyi 'Pazartesi 09:00' bicimine cevirir."""
+    gun, kalan = divmod(int(t) % HAFTA_SN, 86400)
+    return f"{_GUN_ADLARI[CRON_GUNLER[gun]]} {kalan // 3600:02d}:{kalan % 3600 // 60:02d}"
+
+
+def _peak(araliklar: list):
+    """
+    [(baslangic, bitis)] araliklarinin ikinci haftadaki en yuksek
+    eszamanliligini ve zamanini dondurur. Ilk hafta, haftayi asan
+    oturumlarin ikinci haftaya tasmasi icin isinma olarak kullanilir.
+    """
+    olaylar = sorted([(b, 1) for b, _ in araliklar] + [(e, -1) for _, e in araliklar])
+    sayi = tepe = 0
+    tepe_zaman = HAFTA_SN
+    for t, fark in olaylar:
+        if t >= 2 * HAFTA_SN:
+            break
+        sayi += fark
+        if t >= HAFTA_SN and sayi > tepe:
+            tepe, tepe_zaman = sayi, t
+    return tepe, tepe_zaman
+
+
+def simulate(hesaplar: list, katilim_sn: int = SIM_KATILIM_SN) -> dict:
+    """
+    Ders programlarini sanal saatte calistirir ve kapasite raporu uretir.
+
+    hesaplar: [(hesap_adi, aktif_dersler)]. Her hesap ayri bir bot sureci
+    olarak modellenir: ZAMANLAYICI_ISCI thread'lik havuz, tek Chrome profili.
+    Katilim katilim_sn surer; tarayici 'bitis' saatine (yoksa MAX_OTURUM_DAKIKA)
+    kadar acik kalir. Havuzda MISFIRE_GRACE'den uzun bekleyen is kacirilir.
+    Profil baska bir oturumdayken baslayan is tarayici acamaz: SIM_KILITLI_PROFIL_SN
+    icinde basarisiz olup thread'i birakir ve cakisma olarak raporlanir.
+    """
+    sorunlar, cakismalar, kacanlar = [], [], []
+    oturumlar = []  # (baslangic, katilim_bitis, kapanis)
+    tetik_dakika = {}
+    gecerli = 0
+    en_uzun_gecikme = 0
+
+    for hesap, dersler in hesaplar:
+        isler = []
+        gorulen_idler = set()
+        for ders in dersler:
+            etiket = f"{hesap}: {ders.get('kod', '')} {ders.get('ad', '?')}"
+            try:
+                cron_gun, erken = _parse_ders(ders)
+            except ValueError as e:
+                oneri = _suggest_gun(ders.get("gun"))
+                sorunlar.append(f"{etiket} -- {e}" + (f" ('{oneri}' olmali)" if oneri else ""))
+                continue
+
+            job_id = _job_id(ders)
+            if job_id in gorulen_idler:
+                sorunlar.append(f"{etiket} -- is kimligi '{job_id}' tekrar ediyor, zamanlayici baslamaz")
+            gorulen_idler.add(job_id)
+            if erken.day != 1:
+                sorunlar.append(
+                    f"{etiket} -- gece yarisina {DAKIKA_ONCE} dk'dan yakin, "
+                    f"ayni gun {erken:%H:%M}'de tetiklenir"
+                )
+
+            bitis = None
+            if ders.get("bitis"):
+                try:
+                    b = datetime.strptime(ders["bitis"], "%H:%M")
+                    bitis = b.hour * 3600 + b.minute * 60
+                except (TypeError, ValueError):
+                    sorunlar.append(f"{etiket} -- gecersiz bitis: '{ders['bitis']}'")
+
+            gecerli += 1
+            tetik = CRON_GUNLER.index(cron_gun) * 86400 + erken.hour * 3600 + erken.minute * 60
+            isler.append((tetik, bitis, etiket))
+            isler.append((tetik + HAFTA_SN, bitis, etiket))
+
+        # Zamanlayici havuzu: her isci thread'in bosalacagi an (min-heap)
+        isler.sort(key=lambda x: x[0])
+        havuz = [0] * ZAMANLAYICI_ISCI
+        profil_bos, son_etiket = 0, None
+        for tetik, bitis, etiket in isler:
+            olculen = tetik >= HAFTA_SN
+            baslangic = max(tetik, havuz[0])
+            gecikme = baslangic - tetik
+            if olculen:
+                # Kacirilan isler dahil
+                en_uzun_gecikme = max(en_uzun_gecikme, gecikme)
+                tetik_dakika[tetik // 60] = tetik_dakika.get(tetik // 60, 0) + 1
+            if gecikme > MISFIRE_GRACE:
+                if olculen:
+                    kacanlar.append(f"{_fmt_hafta(tetik)} {etiket} ({gecikme // 60} dk gecikme)")
+                continue
+
+            if baslangic < profil_bos:
+                # Profil kilitli: Chrome acilamaz, is kisa surede biter
+                heapq.heapreplace(havuz, baslangic + SIM_KILITLI_PROFIL_SN)
+                if olculen:
+                    cakismalar.append(f"{_fmt_hafta(baslangic)} {etiket} <-> {son_etiket}")
+                continue
+
+            katildi = baslangic + katilim_sn
+            if bitis is None:
+                kapanis = katildi + MAX_OTURUM_DAKIKA * 60
+            else:
+                kapanis = max(katildi, baslangic - baslangic % 86400 + bitis)
+            heapq.heapreplace(havuz, kapanis)
+            oturumlar.append((baslangic, katildi, kapanis))
+            profil_bos, son_etiket = kapanis, etiket
+
+    tepe_tetik = max(tetik_dakika.items(), key=lambda x: x[1], default=(HAFTA_SN // 60, 0))
+    return {
+        "hesap": len(hesaplar),
+        "ders": gecerli,
+        "tepe_tarayici": _peak([(b, e) for b, _, e in oturumlar]),
+        "tepe_lms": _peak([(b, k) for b, k, _ in oturumlar]),
+        "tepe_tetik": (tepe_tetik[1], tepe_tetik[0] * 60),
+        "en_uzun_gecikme": en_uzun_gecikme,
+        "cakismalar": cakismalar,
+        "kacanlar": kacanlar,
+        "sorunlar": sorunlar,
+    }
+
+
+def show_simulation(rapor: dict, limit: int = 10):
+    """Simulasyon raporunu gosterir."""
+    print("\n+===========================================================+")
+    print("|         YTU Bot - Haftalik Kapasite Simulasyonu            |")
+    print("+===========================================================+")
+    print(f"|  Hesap: {rapor['hesap']}   Gecerli ders: {rapor['ders']}")
+    for baslik, (sayi, zaman) in (
+        ("En fazla acik tarayici", rapor["tepe_tarayici"]),
+        ("En fazla eszamanli LMS gezinmesi", rapor["tepe_lms"]),
+        ("Ayni dakikada en fazla tetiklenme", rapor["tepe_tetik"]),
+    ):
+        print(f"|  {baslik}: {sayi} ({_fmt_hafta(zaman)})")
+    print(
+        f"|  En uzun havuz gecikmesi (kacanlar dahil): {rapor['en_uzun_gecikme']} sn "
+        f"(tolerans {MISFIRE_GRACE} sn)"
+    )
+
+    for baslik, satirlar in (
+        ("Kacirilacak tetiklenmeler", rapor["kacanlar"]),
+        ("Ayni Chrome profilinde cakisan oturumlar", rapor["cakismalar"]),
+        ("Gecersiz / sorunlu kayitlar", rapor["sorunlar"]),
+    ):
+        print("+-----------------------------------------------------------+")
+        print(f"|  {baslik}: {len(satirlar)}")
+        for satir in satirlar[:limit]:
+            print(f"|    {satir}")
+        if len(satirlar) > limit:
+            print(f"|    ... ve {len(satirlar) - limit} tane daha")
+    print("+===========================================================+\n")
+
+
+# ─── Kontrol API ─────────────────────────────────────────────────────────────
+
+
+def _find_ders(dersler: list, kod: str):
+    return next((d for d in dersler if d.get("kod") == kod), None)
+
+
+_LOOPBACK = ("127.0.0.1", "localhost")
+
+
+class _KontrolHandler(BaseHTTPRequestHandler):
+    """
+    Calisan zamanlayicinin bellekteki durumunu sunar.
+
+      GET  /status             -> planli isler + canli oturumlar
+      POST /join?kod=MAT1072   -> dersi hemen baslat (ad= ile programda olmayan ders)
+      POST /cancel?kod=MAT1072 -> oturumu iptal et (kod veya oturum id'si)
+
+    Her istek KONTROL_TOKEN_FILE'daki anahtari X-Bot-Token basliginda
+    tasimalidir; loopback disi Host/Origin reddedilir (tarayicidan CSRF'e karsi).
+    """
+
+    def _authorized(self) -> bool:
+        host = (self.headers.get("Host") or "").rsplit(":", 1)[0]
+        if host not in _LOOPBACK:
+            return False
+        origin = self.headers.get("Origin")
+        if origin and urllib.parse.urlsplit(origin).hostname not in _LOOPBACK:
+            return False
+        # bytes karsilastirmasi: ASCII disi baslikta TypeError yerine 403
+        gelen = self.headers.get("X-Bot-Token", "").encode("utf-8", "surrogateescape")
+        return hmac.compare_digest(gelen, self.server.token.encode("ascii"))
+
+    def _reply(self, kod: int, veri: dict):
+        govde = json.dumps(veri, ensure_ascii=False).encode("utf-8")
+        self.send_response(kod)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(govde)))
+        self.end_headers()
+        self.wfile.write(govde)
+
+    def _params(self) -> dict:
+        sorgu = urllib.parse.urlsplit(self.path).query
+        return {k: v[0] for k, v in urllib.parse.parse_qs(sorgu).items()}
+
+    def do_GET(self):
+        if not self._authorized():
+            return self._reply(403, {"hata": "yetkisiz istek"})
+        if urllib.parse.urlsplit(self.path).path != "/status":
+            return self._reply(404, {"hata": "bilinmeyen adres"})
+
+        isler = []
+        for job in self.server.scheduler.get_jobs():
+            sonraki = getattr(job, "next_run_time", None)
+            isler.append({
+                "id": job.id,
+                "ad": job.name,
+                "sonraki": sonraki.isoformat(timespec="seconds") if sonraki else None,
+            })
+        self._reply(200, {"isler": isler, "oturumlar": list_sessions()})
+
+    def do_POST(self):
+        if not self._authorized():
+            return self._reply(403, {"hata": "yetkisiz istek"})
+        yol = urllib.parse.urlsplit(self.path).path
+        params = self._params()
+        kod = params.get("kod", "")
+
+        if yol == "/join":
+            # Tum oturumlar ayni Chrome profilini kullanir; ikinci tarayici acilamaz
+            with _oturum_kilit:
+                canli = list(_oturumlar)
+            if canli:
+                return self._reply(409, {"hata": f"bot profili canli oturumda: {', '.join(canli)}"})
+
+            ders = _find_ders(self.server.dersler, kod) if kod else None
+            if ders:
+                job_args = [ders["ad"], ders["kod"], ders.get("bitis")]
+            else:
+                job_args = [params.get("ad", "TEST DERS"), kod]
+            job = self.server.scheduler.add_job(
+                join_class,
+                args=job_args,
+                id=f"manuel_{kod or 'ders'}_{datetime.now().strftime('%H%M%S%f')}",
+                name=f"{kod} {job_args[0]} (manuel)",
+                misfire_grace_time=MISFIRE_GRACE,
+            )
+            log.info(f"Kontrol API: {job.name} hemen baslatiliyor.")
+            return self._reply(202, {"is": job.id})
+
+        if yol == "/cancel":
+            anahtar = params.get("id") or kod
+            iptaller = cancel_sessions(anahtar) if anahtar else []
+            if not iptaller:
+                return self._reply(404, {"hata": f"canli oturum bulunamadi: {anahtar}"})
+            return self._reply(200, {"iptal": iptaller})
+
+        self._reply(404, {"hata": "bilinmeyen adres"})
+
+    def log_message(self, format, *args):
+        log.debug("Kontrol API: " + format % args)
+
+
+def start_control_api(scheduler, dersler: list):
+    """Kontrol API'sini arka plan thread'inde baslatir."""
+    try:
+        server = ThreadingHTTPServer((KONTROL_HOST, KONTROL_PORT), _KontrolHandler)
+    except OSError as e:
+        log.error(f"[HATA] Kontrol API baslatilamadi ({KONTROL_HOST}:{KONTROL_PORT}): {e}")
+        return None
+
+    server.daemon_threads = True
+    server.scheduler = scheduler
+    server.dersler = dersler
+    server.token = secrets.token_hex(16)
+    fd = os.open(KONTROL_TOKEN_FILE, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w") as f:
+        f.write(server.token)
+    threading.Thread(target=server.serve_forever, name="kontrol-api", daemon=True).start()
+    log.info(f"Kontrol API dinleniyor: http://{KONTROL_HOST}:{KONTROL_PORT}")
+    return server
+
+
+def stop_control_api(server):
+    server.shutdown()
+    server.server_close()
+    try:
+        KONTROL_TOKEN_FILE.unlink()
+    except OSError:
+        pass
+
+
+def api_request(method: str, yol: str, **params):
+    """
+    Calisan zamanlayiciya istek atar.
+    Zamanlayici calismiyorsa None dondurur.
+    """
+    try:
+        token = KONTROL_TOKEN_FILE.read_text().strip()
+    except OSError:
+        return None
+
+    url = f"http://{KONTROL_HOST}:{KONTROL_PORT}{yol}"
+    if params:
+        url += "?" + urllib.parse.urlencode(params)
+    istek = urllib.request.Request(url, method=method, headers={"X-Bot-Token": token})
+    try:
+        try:
+            with urllib.request.urlopen(istek, timeout=KONTROL_TIMEOUT) as yanit:
+                return json.loads(yanit.read().decode("utf-8"))
+        except urllib.error.HTTPError as e:
+            return json.loads(e.read().decode("utf-8"))
+    except (urllib.error.URLError, OSError, ValueError):
+        # Portta baska bir uygulama var veya yanit JSON degil
+        return None
+
+
+def show_live_status(durum: dict):
+    """Calisan zamanlayicidan gelen durumu gosterir."""
+    print("\n+===========================================================+")
+    print("|         YTU Otomatik Derse Katilim Botu (calisiyor)        |")
+    print("+===========================================================+")
+    print(f"|  {len(durum['isler'])} planli is:")
+    for job in durum["isler"]:
+        sonraki = (job["sonraki"] or "-")[:16].replace("T", " ")
+        print(f"|  {sonraki}  {job['ad']}")
+    print("+-----------------------------------------------------------+")
+    if not durum["oturumlar"]:
+        print("|  Canli oturum yok.")
+    for o in durum["oturumlar"]:
+        gecen = f"{o['gecen_saniye'] // 60}dk{o['gecen_saniye'] % 60:02d}s"
+        print(f"|  {o['id']:<14} {o['asama']:<15} {gecen:>9}  {o['ders'][:18]}")
+    print("+===========================================================+\n")
+
+
 # ─── Ana Program ─────────────────────────────────────────────────────────────
 
 def main():
@@ -722,17 +1683,41 @@ def main():
   python auto_joiner.py           Normal mod - zamanlayıcı başlar
   python auto_joiner.py --test    Hemen derse katılmayı dener
   python auto_joiner.py --status  Planlanmış dersleri gösterir
+  python auto_joiner.py --iptal MAT1072  Canlı oturumu kapatır
+  python auto_joiner.py --simule a.json b.json  Haftalık kapasite simülasyonu
         """,
     )
     parser.add_argument("--test", action="store_true", help="Test modu: hemen katilmayi dener")
     parser.add_argument("--ders", type=str, default=None,
                         help="Test icin ders kodu (orn: MAT1072)")
     parser.add_argument("--status", action="store_true", help="Aktif ders programini gosterir")
+    parser.add_argument("--iptal", type=str, default=None, metavar="KOD",
+                        help="Calisan zamanlayicidaki canli oturumu iptal eder")
+    parser.add_argument("--simule", nargs="*", default=None, metavar="DOSYA",
+                        help="Programlari sanal saatte bir hafta calistirir (her dosya bir hesap)")
+    parser.add_argument("--katilim-sn", type=int, default=SIM_KATILIM_SN,
+                        help=f"Simulasyonda katilim suresi (varsayilan: {SIM_KATILIM_SN})")
     parser.add_argument("--profile", type=str, default=None,
                         help="Chrome profil adi (varsayilan: Default)")
 
     args = parser.parse_args()
 
+    if args.simule is not None:
+        hesaplar = []
+        for dosya in [Path(d) for d in args.simule] or [SCHEDULE_FILE]:
+            try:
+                data, aktif = _read_schedule(dosya)
+            except (OSError, ValueError) as e:
+                log.error(f"[HATA] Program dosyasi okunamadi: {dosya} ({e})")
+                sys.exit(1)
+            hesaplar.append((data.get("login", {}).get("email") or dosya.stem, aktif))
+
+        baslangic = time.perf_counter()
+        rapor = simulate(hesaplar, args.katilim_sn)
+        log.info(f"Simulasyon {time.perf_counter() - baslangic:.2f} sn surdu.")
+        show_simulation(rapor)
+        return
+
     # Chrome profili override
     global CHROME_PROFILE
     if args.profile:
@@ -742,10 +1727,41 @@ def main():
     # Program yukle
     dersler = load_schedule()
 
+    # Zamanlayici calisiyorsa komutlar ona iletilir (yeni tarayici acilmaz)
     if args.status:
-        show_status(dersler)
+        durum = api_request("GET", "/status")
+        if durum:
+            show_live_status(durum)
+        else:
+            show_status(dersler)
+        return
+
+    if args.iptal:
+        yanit = api_request("POST", "/cancel", kod=args.iptal)
+        if yanit is None:
+            log.error("[HATA] Calisan zamanlayici bulunamadi.")
+        elif "iptal" in yanit:
+            log.info(f"[OK] Iptal edilen oturumlar: {', '.join(yanit['iptal'])}")
+        else:
+            log.error(f"[HATA] {yanit['hata']}")
         return
 
+    if args.test:
+        kod = args.ders or (dersler[0].get("kod", "") if dersler else "")
+        yanit = api_request("POST", "/join", kod=kod)
+        if yanit is not None:
+            if "hata" in yanit:
+                log.error(f"[HATA] Zamanlayici istegi reddetti: {yanit['hata']}")
+            else:
+                log.info(f"TEST MODU -- Calisan zamanlayiciya iletildi: {yanit}")
+            return
+    elif api_request("GET", "/status") is not None:
+        log.error("[HATA] Zamanlayici zaten calisiyor, ikinci kopya baslatilmadi.")
+        return
+
+    # Onceki calismadan kalan bot tarayicilarini temizle
+    reap_orphan_browsers()
+
     if args.test:
         log.info("TEST MODU -- Hemen derse katilim deneniyor...")
         if args.ders:
@@ -777,12 +1793,20 @@ def main():
     log.info("")
 
     scheduler = setup_scheduler(dersler)
+    api = start_control_api(scheduler, dersler)
+    if api is None:
+        # API olmadan --status/--test bu zamanlayiciyi goremez
+        log.error("[HATA] Kontrol API'si olmadan zamanlayici baslatilmadi.")
+        return
 
     try:
         scheduler.start()
     except (KeyboardInterrupt, SystemExit):
         log.info("\n👋 Bot durduruldu. Görüşmek üzere!")
         scheduler.shutdown()
+    finally:
+        if api:
+            stop_control_api(api)
 
 
 if __name__ == "__main__":
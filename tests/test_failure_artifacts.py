@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""Hata kayitlari: bozuk ayarlarla varsayilana donus ve DOM siniri."""
+
+import gzip
+import json
+import logging
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import auto_joiner as aj  # noqa: E402
+
+
+class SahteDriver:
+    current_url = "https://online.yildiz.edu.tr/cockpit?x=1"
+
+    def __init__(self, dom: str):
+        self.dom = dom
+        self.ekran_goruntusu = 0
+
+    def execute_script(self, betik, sinir):
+        return self.dom[:sinir]
+
+    def get_screenshot_as_png(self):
+        self.ekran_goruntusu += 1
+        return b"\x89PNG"
+
+
+@pytest.fixture
+def kayit_dizini(tmp_path, monkeypatch):
+    monkeypatch.setattr(aj, "HATA_KAYIT_DIR", tmp_path)
+    monkeypatch.setattr(aj, "_son_kayitlar", {})
+    return tmp_path
+
+
+def _kaydet(driver, etiket="test"):
+    oturum = aj._start_session("Ders", "KOD1")
+    try:
+        aj.record_failure(driver, oturum, etiket)
+    finally:
+        aj._end_session(oturum)
+    aj._kayit_havuzu.submit(lambda: None).result(timeout=5)
+
+
+@pytest.mark.parametrize(
+    "ayarlar",
+    [
+        {"hata_kaydi": True, "login": {"email": None}},
+        {"hata_kaydi": ["ekran_goruntusu"], "login": "ogrenci"},
+        {"hata_kaydi": {"ekran_goruntusu": "evet"}, "login": {"email": 123}},
+    ],
+)
+def test_invalid_settings_fall_back_with_warning(kayit_dizini, monkeypatch, caplog, ayarlar):
+    caplog.set_level(logging.WARNING, logger="YTU-Bot")
+    monkeypatch.setattr(aj, "load_settings", lambda: ayarlar)
+    driver = SahteDriver("<html></html>")
+
+    _kaydet(driver)
+
+    assert driver.ekran_goruntusu == 0
+    assert list(kayit_dizini.glob("bot_KOD1/*.json.gz"))
+    assert "'login.email' metin olmali" in caplog.text
+    assert "hata_kaydi" in caplog.text
+
+
+def test_dom_is_truncated_and_screenshot_is_opt_in(kayit_dizini, monkeypatch):
+    monkeypatch.setattr(aj, "HATA_KAYIT_MAX_DOM", 100)
+    monkeypatch.setattr(
+        aj,
+        "load_settings",
+        lambda: {"hata_kaydi": {"ekran_goruntusu": True}, "login": {"email": "21011001@std.yildiz.edu.tr"}},
+    )
+    driver = SahteDriver("<html>" + "x" * 10_000 + "</html>")
+
+    _kaydet(driver)
+
+    (kayit,) = kayit_dizini.glob("21011001_KOD1/*.json.gz")
+    with gzip.open(kayit, "rt", encoding="utf-8") as f:
+        assert len(json.load(f)["dom"]) == 100
+    assert driver.ekran_goruntusu == 1
+    assert list(kayit_dizini.glob("21011001_KOD1/*.png"))
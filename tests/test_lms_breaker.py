@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+"""LMS devre kesicisi: hic yanit vermeyen sahte LMS sunucusuna karsi testler."""
+
+import logging
+import socket
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import auto_joiner as aj  # noqa: E402
+
+
+@pytest.fixture
+def stub_lms(monkeypatch):
+    """Varsayilan olarak hic yanit vermeyen sahte LMS; durum["ayakta"] ile acilir."""
+    durum = {"ayakta": False}
+    kapat = threading.Event()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if not durum["ayakta"]:
+                kapat.wait(30)  # yanit yok -> istemci zaman asimina duser
+                return
+            self.send_response(200)
+            self.end_headers()
+            self.wfile.write(b"ok")
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    monkeypatch.setattr(aj, "LMS_PROBE_URL", f"http://127.0.0.1:{server.server_port}/")
+    monkeypatch.setattr(aj, "LMS_PROBE_TIMEOUT", 0.2)
+    monkeypatch.setattr(aj, "KESICI_ESIK", 3)
+    monkeypatch.setattr(aj, "KESICI_BEKLEME", 0.5)
+    monkeypatch.setattr(aj, "KESICI_KADEME", 0.4)
+    monkeypatch.setattr(aj, "KESICI_MAX_BEKLEME", 20)
+    monkeypatch.setattr(aj, "_kesici", {"durum": "kapali", "hata": 0, "acilma": 0.0, "sira": 0})
+
+    yield durum
+
+    kapat.set()
+    server.shutdown()
+    server.server_close()
+
+
+def _open_breaker():
+    with aj._kesici_kilit:
+        aj._kesici["hata"] = aj.KESICI_ESIK
+        aj._circuit_transition("acik", "test")
+
+
+def test_breaker_opens_after_threshold(stub_lms, caplog):
+    caplog.set_level(logging.INFO, logger="YTU-Bot")
+
+    for _ in range(aj.KESICI_ESIK - 1):
+        assert aj.probe_lms() is False
+        aj.record_lms_failure("prob_basarisiz")
+        assert not aj.lms_circuit_open()
+
+    assert aj.probe_lms() is False
+    aj.record_lms_failure("prob_basarisiz")
+
+    assert aj.lms_circuit_open()
+    assert "[METRIK] lms_kesici durum=acik onceki=kapali" in caplog.text
+
+
+def test_wait_gives_up_while_lms_is_down(stub_lms, monkeypatch):
+    monkeypatch.setattr(aj, "KESICI_MAX_BEKLEME", 1.5)
+    oturum = aj._start_session("Ders", "DOWN")
+    try:
+        baslangic = time.monotonic()
+        assert aj.wait_for_lms(oturum) is False
+        assert time.monotonic() - baslangic < 5
+    finally:
+        aj._end_session(oturum)
+    assert aj.lms_circuit_open()
+
+
+def test_single_half_open_prober_and_staggered_release(stub_lms, monkeypatch, caplog):
+    caplog.set_level(logging.INFO, logger="YTU-Bot")
+
+    gercek_prob = aj.probe_lms
+    sayac_kilit = threading.Lock()
+    yari_acik = {"aktif": 0, "tepe": 0, "toplam": 0}
+
+    def sayan_prob():
+        olcum = aj._kesici["durum"] == "yari_acik"
+        if olcum:
+            with sayac_kilit:
+                yari_acik["aktif"] += 1
+                yari_acik["toplam"] += 1
+                yari_acik["tepe"] = max(yari_acik["tepe"], yari_acik["aktif"])
+        try:
+            return gercek_prob()
+        finally:
+            if olcum:
+                with sayac_kilit:
+                    yari_acik["aktif"] -= 1
+
+    monkeypatch.setattr(aj, "probe_lms", sayan_prob)
+    _open_breaker()
+
+    birakilma, sonuclar = {}, {}
+
+    def calistir(i):
+        oturum = aj._start_session("Ders", f"T{i}")
+        try:
+            sonuclar[i] = aj.wait_for_lms(oturum)
+            birakilma[i] = time.monotonic()
+        finally:
+            aj._end_session(oturum)
+
+    threadler = [threading.Thread(target=calistir, args=(i,)) for i in range(4)]
+    for t in threadler:
+        t.start()
+    time.sleep(2.5)
+    stub_lms["ayakta"] = True
+    for t in threadler:
+        t.join(timeout=20)
+
+    assert sonuclar == {i: True for i in range(4)}
+    assert yari_acik["toplam"] >= 2
+    assert yari_acik["tepe"] == 1
+
+    zamanlar = sorted(birakilma.values())
+    for onceki, sonraki in zip(zamanlar, zamanlar[1:]):
+        assert sonraki - onceki >= aj.KESICI_KADEME * 0.8
+
+    for durum in ("acik", "yari_acik", "kapali"):
+        assert f"[METRIK] lms_kesici durum={durum}" in caplog.text
+
+
+def test_transient_failures_do_not_grow_stagger(stub_lms, monkeypatch):
+    sonuclar = iter([False, True] * 5)
+    monkeypatch.setattr(aj, "probe_lms", lambda: next(sonuclar))
+
+    for i in range(5):
+        oturum = aj._start_session("Ders", f"BLIP{i}")
+        try:
+            baslangic = time.monotonic()
+            assert aj.wait_for_lms(oturum) is True
+            # Tek bir yeniden deneme beklemesi, kademe yok
+            assert time.monotonic() - baslangic < 1.5
+        finally:
+            aj._end_session(oturum)
+
+    assert not aj.lms_circuit_open()
+    assert aj._kesici["sira"] == 0
+
+
+def test_probe_treats_protocol_errors_as_failure(monkeypatch):
+    sunucu = socket.socket()
+    sunucu.bind(("127.0.0.1", 0))
+    sunucu.listen(1)
+
+    def bozuk_yanit():
+        baglanti, _ = sunucu.accept()
+        baglanti.recv(1024)
+        baglanti.sendall(b"CAPTIVE PORTAL\r\n\r\n")
+        baglanti.close()
+
+    threading.Thread(target=bozuk_yanit, daemon=True).start()
+    monkeypatch.setattr(aj, "LMS_PROBE_URL", f"http://127.0.0.1:{sunucu.getsockname()[1]}/")
+    try:
+        assert aj.probe_lms() is False
+    finally:
+        sunucu.close()
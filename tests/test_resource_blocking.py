@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+"""LMS kaynak engelleme: desen eslesmesi ve sahte LMS cockpit'i uzerinde olcum."""
+
+import logging
+import re
+import sys
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import auto_joiner as aj  # noqa: E402
+
+# Sahte cockpit'in kaynaklari: yol -> (boyut, engellenmeli mi)
+VARLIKLAR = {
+    "/img/logo.png": (150_000, True),
+    "/img/banner.jpg?v=3": (300_000, True),
+    "/img/sprite.gif": (50_000, True),
+    "/fonts/roboto.woff2": (80_000, True),
+    "/google-analytics.com/analytics.js": (40_000, True),
+    "/js/jquery.icons.js": (30_000, False),
+    "/js/jquery.svg.js": (25_000, False),
+    "/js/app.js": (20_000, False),
+    "/css/site.css": (10_000, False),
+}
+VARLIK_GECIKME = 0.03  # saniye - yogun kampus agi
+
+COCKPIT = """<!doctype html><html><head><meta charset="utf-8">
+<link rel="stylesheet" href="/css/site.css">
+<style>@font-face { font-family: R; src: url(/fonts/roboto.woff2); } body { font-family: R; }</style>
+<script src="/google-analytics.com/analytics.js"></script>
+<script src="/js/jquery.icons.js"></script>
+<script src="/js/jquery.svg.js"></script>
+<script src="/js/app.js"></script>
+</head><body>
+<img src="/img/logo.png"><img src="/img/banner.jpg?v=3"><img src="/img/sprite.gif">
+<a href="#">ETKİNLİK AKIŞI</a>
+</body></html>"""
+
+
+def chrome_matches(url: str, desen: str) -> bool:
+    """Network.setBlockedURLs eslemesi: '*' ile bolunen parcalar URL'de sirayla aranir."""
+    konum = 0
+    for parca in desen.split("*"):
+        konum = url.find(parca, konum)
+        if konum < 0:
+            return False
+        konum += len(parca)
+    return True
+
+
+def is_blocked(url: str, desenler: list) -> bool:
+    return any(chrome_matches(url, d) for d in desenler)
+
+
+@pytest.fixture
+def stub_cockpit():
+    sunulan = []  # (yol, bayt)
+    kilit = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == "/cockpit":
+                govde, tur = COCKPIT.encode("utf-8"), "text/html; charset=utf-8"
+            elif self.path in VARLIKLAR:
+                time.sleep(VARLIK_GECIKME)
+                govde, tur = b"/*" + b"x" * (VARLIKLAR[self.path][0] - 4) + b"*/", "application/octet-stream"
+            else:
+                self.send_response(404)
+                self.end_headers()
+                return
+            with kilit:
+                sunulan.append((self.path, len(govde)))
+            self.send_response(200)
+            self.send_header("Content-Type", tur)
+            self.send_header("Content-Length", str(len(govde)))
+            self.send_header("Cache-Control", "no-store")
+            self.end_headers()
+            self.wfile.write(govde)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}", sunulan
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.parametrize("yol,engellenmeli", [(y, e) for y, (_, e) in VARLIKLAR.items()])
+def test_default_patterns_block_assets_but_keep_scripts(yol, engellenmeli):
+    url = f"https://online.yildiz.edu.tr{yol}"
+    assert is_blocked(url, aj.ENGELLENEN_KAYNAKLAR) is engellenmeli
+
+
+def _load_like_browser(taban: str, desenler: list):
+    """Sayfayi ve engellenmeyen kaynaklarini indirir: (bayt, sure, indirilen yollar)."""
+    baslangic = time.perf_counter()
+    with urllib.request.urlopen(f"{taban}/cockpit") as yanit:
+        html = yanit.read()
+    toplam = len(html)
+    indirilen = []
+    for eslesme in re.finditer(r'(?:src|href)="(/[^"]+)"|url\((/[^)]+)\)', html.decode("utf-8")):
+        yol = eslesme.group(1) or eslesme.group(2)
+        if is_blocked(taban + yol, desenler):
+            continue
+        with urllib.request.urlopen(taban + yol) as yanit:
+            toplam += len(yanit.read())
+        indirilen.append(yol)
+    return toplam, time.perf_counter() - baslangic, indirilen
+
+
+def test_stub_cockpit_benchmark(stub_cockpit):
+    taban, _ = stub_cockpit
+
+    tam_bayt, tam_sure, tam_yollar = _load_like_browser(taban, [])
+    eng_bayt, eng_sure, eng_yollar = _load_like_browser(taban, aj.ENGELLENEN_KAYNAKLAR)
+    print(
+        f"\n[BENCH] engelsiz: {tam_bayt // 1024} KB {tam_sure * 1000:.0f} ms | "
+        f"engelli: {eng_bayt // 1024} KB {eng_sure * 1000:.0f} ms"
+    )
+
+    assert set(tam_yollar) == set(VARLIKLAR)
+    assert set(eng_yollar) == {y for y, (_, e) in VARLIKLAR.items() if not e}
+    assert eng_bayt < tam_bayt / 4
+    assert eng_sure < tam_sure
+
+
+@pytest.fixture
+def headless_chrome():
+    from selenium import webdriver
+    from selenium.common.exceptions import WebDriverException
+
+    options = webdriver.ChromeOptions()
+    options.add_argument("--headless=new")
+    options.add_argument("--no-sandbox")
+    try:
+        driver = webdriver.Chrome(options=options)
+    except WebDriverException as e:
+        pytest.skip(f"Chrome baslatilamadi: {e.msg}")
+    yield driver
+    driver.quit()
+
+
+def test_chrome_benchmark_with_cdp_blocking(stub_cockpit, headless_chrome, caplog):
+    taban, sunulan = stub_cockpit
+    caplog.set_level(logging.INFO, logger="YTU-Bot")
+    sonuc = {}
+
+    for ad, desenler in (("engelsiz", []), ("engelli", aj.ENGELLENEN_KAYNAKLAR)):
+        aj._set_blocked_urls(headless_chrome, desenler)
+        sunulan.clear()
+        baslangic = time.perf_counter()
+        headless_chrome.get(f"{taban}/cockpit?{ad}")
+        sonuc[ad] = (sum(b for _, b in sunulan), time.perf_counter() - baslangic, {y for y, _ in sunulan})
+        aj._log_page_metrics(headless_chrome, ad)
+
+    print(
+        f"\n[BENCH] chrome engelsiz: {sonuc['engelsiz'][0] // 1024} KB {sonuc['engelsiz'][1] * 1000:.0f} ms | "
+        f"engelli: {sonuc['engelli'][0] // 1024} KB {sonuc['engelli'][1] * 1000:.0f} ms"
+    )
+    engellenenler = {y for y, (_, e) in VARLIKLAR.items() if e}
+    assert not (sonuc["engelli"][2] & engellenenler)
+    assert {"/js/jquery.icons.js", "/js/jquery.svg.js", "/css/site.css"} <= sonuc["engelli"][2]
+    assert sonuc["engelli"][0] < sonuc["engelsiz"][0] / 4
+    assert "[METRIK] sayfa=engelli" in caplog.text
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""--simule: sonucu bilinen kucuk programlarla sanal saat simulasyonu."""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import auto_joiner as aj  # noqa: E402
+
+
+def ders(kod, gun="Pazartesi", saat="09:00", bitis=None):
+    kayit = {"ad": f"Ders {kod}", "kod": kod, "gun": gun, "saat": saat, "aktif": True}
+    if bitis:
+        kayit["bitis"] = bitis
+    return kayit
+
+
+def test_peak_concurrency_across_accounts():
+    hesaplar = [(f"hesap{i}", [ders(f"K{i}", bitis="10:50")]) for i in range(3)]
+    hesaplar.append(("hesap3", [ders("K3", saat="11:00", bitis="12:50")]))
+
+    rapor = aj.simulate(hesaplar, katilim_sn=90)
+
+    assert rapor["ders"] == 4
+    assert rapor["tepe_tarayici"][0] == 3
+    assert aj._fmt_hafta(rapor["tepe_tarayici"][1]) == "Pazartesi 08:58"
+    assert rapor["tepe_lms"][0] == 3
+    assert rapor["tepe_tetik"][0] == 3
+    assert rapor["kacanlar"] == []
+    assert rapor["cakismalar"] == []
+    assert rapor["en_uzun_gecikme"] == 0
+
+
+def test_misfire_when_pool_is_saturated(monkeypatch):
+    monkeypatch.setattr(aj, "ZAMANLAYICI_ISCI", 1)
+    # Bitissiz ders isciyi MAX_OTURUM_DAKIKA boyunca tutar
+    hesaplar = [("hesap", [ders("A"), ders("B", saat="09:30")])]
+
+    rapor = aj.simulate(hesaplar, katilim_sn=90)
+
+    assert len(rapor["kacanlar"]) == 1
+    assert "B" in rapor["kacanlar"][0]
+    beklenen = 90 + aj.MAX_OTURUM_DAKIKA * 60 - 30 * 60
+    assert rapor["en_uzun_gecikme"] == beklenen
+    assert rapor["en_uzun_gecikme"] > aj.MISFIRE_GRACE
+
+
+def test_profile_collisions_fail_fast_instead_of_holding_workers(monkeypatch):
+    monkeypatch.setattr(aj, "ZAMANLAYICI_ISCI", 2)
+    hesaplar = [("hesap", [ders("A"), ders("B", saat="09:10"), ders("C", saat="09:20")])]
+
+    rapor = aj.simulate(hesaplar, katilim_sn=90)
+
+    assert len(rapor["cakismalar"]) == 2
+    assert rapor["kacanlar"] == []
+    assert rapor["tepe_tarayici"][0] == 1
+
+
+def test_invalid_gun_values_are_flagged_with_suggestions():
+    dersler = [
+        ders("S1", gun="Sali"),
+        ders("S2", gun="Carsamba"),
+        ders("S3", gun="Persembe"),
+        ders("S4", gun="Pzt"),
+        ders("S5", gun="Salı"),
+        ders("S6", saat="00:01"),
+    ]
+
+    rapor = aj.simulate([("hesap", dersler)])
+
+    sorunlar = "\n".join(rapor["sorunlar"])
+    assert rapor["ders"] == 2
+    assert "'Sali' ('Salı' olmali)" in sorunlar
+    assert "'Carsamba' ('Çarşamba' olmali)" in sorunlar
+    assert "'Persembe' ('Perşembe' olmali)" in sorunlar
+    assert "Gecersiz gun: 'Pzt'" in sorunlar and "'Pzt' (" not in sorunlar
+    assert "S6" in sorunlar and "gece yarisina" in sorunlar
+
+
+def test_tens_of_thousands_of_entries_run_in_seconds():
+    gunler = list(aj.GUN_MAP)
+    hesaplar = [
+        (
+            f"hesap{h}",
+            [
+                ders(f"K{h}_{i}", gun=gunler[i % 7], saat=f"{8 + i % 12:02d}:{(i * 7) % 60:02d}",
+                     bitis=f"{9 + i % 12:02d}:50" if i % 2 else None)
+                for i in range(100)
+            ],
+        )
+        for h in range(300)
+    ]
+
+    baslangic = time.perf_counter()
+    rapor = aj.simulate(hesaplar)
+    sure = time.perf_counter() - baslangic
+
+    assert rapor["ders"] == 30_000
+    assert sure < 10